@@ -1,12 +1,25 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
+import pyarrow as pa  # ships with streamlit
 from pathlib import Path
 import sqlite3
 import hashlib
+import hmac
+import secrets
 import datetime as dt
+import time
+import functools
+import json
+import contextlib
+import queue
+import threading
+import difflib
+import shutil
 import re
 import os
-from typing import Optional, Dict, Any, List, Tuple
+import warnings
+from typing import Optional, Dict, Any, List, Tuple, BinaryIO, Iterator
 
 # ============================================================
 # CONFIG
@@ -31,6 +44,15 @@ ROLES = ["Player", "Parent", "Scout", "Academy", "Admin"]
 AGE_GROUPS = ["U10", "U14", "U17", "U23"]
 GENDERS = ["M", "F"]
 
+EMAIL_RE = re.compile(r"^[^\s@]+@[^\s@]+\.[^\s@]+$", re.I)
+UNSAFE_FILENAME_RE = re.compile(r"[^a-zA-Z0-9._-]+")
+WORD_RE = re.compile(r"\w+")
+
+AGE_COLUMN_KEYS = frozenset({"age_group", "agegroup", "age group", "age group(s)"})
+GENDER_COLUMN_KEYS = frozenset({"gender", "sex"})
+# low-cardinality columns stored as pandas categoricals at load time
+CATEGORY_COLUMN_KEYS = AGE_COLUMN_KEYS | GENDER_COLUMN_KEYS | {"sport", "club", "city", "dominant_side", "unit"}
+
 APP_TITLE = "ASABIG – Talent Identification Platform (Pilot Demo)"
 
 
@@ -44,36 +66,224 @@ def safe_df(df: pd.DataFrame) -> pd.DataFrame:
         return pd.DataFrame(df)
     if df.empty:
         return df
-    out = df.copy()
-    for c in out.columns:
+    out = df
+    for c in df.columns:
+        col = df[c]
         try:
-            if out[c].dtype == "object":
-                out[c] = out[c].apply(lambda x: "" if pd.isna(x) else str(x))
+            if col.dtype != "object":
+                continue
+            # all plain strings (no None/NaN/mixed values): nothing to normalise
+            if pd.api.types.infer_dtype(col, skipna=False) == "string":
+                continue
+            fixed = col.where(col.notna(), "").astype(str)
         except Exception:
-            out[c] = out[c].astype(str)
+            fixed = col.astype(str)
+        if out is df:
+            out = df.copy()  # only copy once something actually needs fixing
+        out[c] = fixed
     return out
 
 
+def category_mask(s: pd.Series, value: str) -> np.ndarray:
+    """Rows of categorical `s` whose category (as str) equals `value`, matched on codes."""
+    code = s.cat.categories.astype(str).get_indexer([value])[0]
+    if code < 0:
+        return np.zeros(len(s), dtype=bool)
+    return s.cat.codes.to_numpy() == code
+
+
+def numeric_summary(nums: pd.DataFrame) -> pd.DataFrame:
+    """
+    describe()-style stats (count/mean/std/min/quartiles/max) computed with one
+    numpy pass per statistic over the numeric block.
+    """
+    arr = nums.to_numpy(dtype="float64", na_value=np.nan)
+    with warnings.catch_warnings():
+        # all-NaN columns just yield NaN stats
+        warnings.simplefilter("ignore", RuntimeWarning)
+        qs = np.nanpercentile(arr, [25, 50, 75], axis=0)
+        return pd.DataFrame({
+            "count": (~np.isnan(arr)).sum(axis=0),
+            "mean": np.nanmean(arr, axis=0),
+            "std": np.nanstd(arr, axis=0, ddof=1),
+            "min": np.nanmin(arr, axis=0),
+            "25%": qs[0],
+            "50%": qs[1],
+            "75%": qs[2],
+            "max": np.nanmax(arr, axis=0),
+        }, index=nums.columns)
+
+
+def athlete_name_index(df: pd.DataFrame, name_col: str = "full_name") -> Tuple[List[str], Dict[str, str]]:
+    """
+    Picker labels in frame order + label -> athlete_id. Names shared by several athletes
+    are shown as "Name (athlete_id)" so each of them can still be picked.
+    """
+    names = df[name_col].astype(str)
+    ids = df["athlete_id"].astype(str)
+    dup = names.duplicated(keep=False).to_numpy()
+    labels = [f"{n} ({i})" if d else n for n, i, d in zip(names, ids, dup)]
+    return labels, dict(zip(labels, ids))
+
+
+def name_shortlist(names: List[str], query: str, limit: int = 50) -> List[str]:
+    """Substring hits first, then close fuzzy matches, capped at `limit` names."""
+    q = query.strip().lower()
+    if not q:
+        return names
+    lowered = {}
+    for n in names:
+        lowered.setdefault(n.lower(), n)
+    hits = [n for low, n in lowered.items() if q in low][:limit]
+    if len(hits) < limit:
+        seen = set(hits)
+        for low in difflib.get_close_matches(q, list(lowered), n=limit, cutoff=0.6):
+            if lowered[low] not in seen and len(hits) < limit:
+                hits.append(lowered[low])
+    return hits
+
+
+def show_df(df: pd.DataFrame, key: str, height: int = 320, page_size: int = 200):
+    """st.dataframe that only serializes one page of rows at a time."""
+    n = len(df)
+    start = 0
+    if n > page_size:
+        last = (n - 1) // page_size * page_size
+        start = st.slider("Rows from", 0, last, 0, step=page_size, key=key)
+        st.caption(f"Showing rows {start + 1}–{min(start + page_size, n)} of {n}")
+    st.dataframe(safe_df(df.iloc[start:start + page_size]), use_container_width=True, height=height)
+
+
 def db() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    # pooled connections are reused across reruns, so a larger prepared-statement LRU keeps
+    # every query's compiled statement resident (default is 128)
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, cached_statements=256)
     conn.execute("PRAGMA foreign_keys = ON;")
     return conn
 
 
+DB_POOL_SIZE = 4
+USERS_PAGE_SIZE = 50
+SEARCH_LIMIT = 200
+USERS_CURSOR_START = 2**63 - 1
+
+
+@st.cache_resource(show_spinner=False)
+def get_pool() -> queue.Queue:
+    """Small pool of long-lived connections shared by all sessions (never closed)."""
+    pool = queue.Queue(maxsize=DB_POOL_SIZE)
+    for _ in range(DB_POOL_SIZE):
+        conn = db()
+        conn.execute("PRAGMA journal_mode = WAL;")
+        conn.execute("PRAGMA synchronous = NORMAL;")
+        # pooled connections live for the whole process, so a bigger page cache and mmap pay off
+        conn.execute("PRAGMA temp_store = MEMORY;")
+        conn.execute("PRAGMA cache_size = -20000;")  # ~20 MB
+        conn.execute("PRAGMA mmap_size = 134217728;")  # 128 MB
+        pool.put(conn)
+    return pool
+
+
+@st.cache_resource(show_spinner=False)
+def get_write_lock() -> threading.RLock:
+    """Process-wide writer lock: SQLite takes one writer at a time, so queue here instead of on SQLITE_BUSY."""
+    return threading.RLock()
+
+
+@contextlib.contextmanager
+def db_conn(write: bool = False) -> Iterator[sqlite3.Connection]:
+    """Borrow a pooled connection for one helper call; uncommitted work is rolled back on return."""
+    pool = get_pool()
+    with get_write_lock() if write else contextlib.nullcontext():
+        conn = pool.get()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            pool.put(conn)
+
+
+def db_executemany(sql: str, rows) -> int:
+    """Run one statement for every parameter row inside a single transaction; returns rows changed."""
+    with db_conn(write=True) as conn:
+        with conn:
+            return conn.executemany(sql, rows).rowcount
+
+
+def query_df(sql: str, conn: sqlite3.Connection, params: tuple = ()) -> pd.DataFrame:
+    # build the frame straight from the cursor rows (skips pandas' SQL layer), as Arrow-backed
+    # columns so caching and st.dataframe serialisation don't go through per-cell Python objects
+    cur = conn.execute(sql, params)
+    cols = [d[0] for d in cur.description]
+    rows = cur.fetchall()
+    try:
+        table = pa.table([pa.array(list(v)) for v in zip(*rows)] if rows else
+                         [pa.array([], pa.null()) for _ in cols], names=cols)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # a column with mixed SQLite storage classes: fall back to object columns
+        return pd.DataFrame.from_records(rows, columns=cols)
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def query_table(sql: str, conn: sqlite3.Connection, params: tuple = ()) -> pa.Table:
+    """Results as a pyarrow Table for tables that are only displayed: st.dataframe takes it as is, no pandas frame."""
+    cur = conn.execute(sql, params)
+    cols = [d[0] for d in cur.description]
+    rows = cur.fetchall()
+    arrays = []
+    for v in zip(*rows) if rows else [()] * len(cols):
+        try:
+            arrays.append(pa.array(list(v)))
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # mixed SQLite storage classes in one column: show it as text
+            arrays.append(pa.array([None if x is None else str(x) for x in v], pa.string()))
+    return pa.table(arrays, names=cols)
+
+
 def sha256(s: str) -> str:
     return hashlib.sha256(s.encode("utf-8")).hexdigest()
 
 
-def now_ts() -> str:
-    return dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+PBKDF2_ITERATIONS = 200_000
+
+
+def hash_password(password: str) -> str:
+    """Salted PBKDF2-SHA256, stored as pbkdf2_sha256$<iterations>$<salt hex>$<hash hex>."""
+    salt = secrets.token_bytes(16)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, PBKDF2_ITERATIONS)
+    return f"pbkdf2_sha256${PBKDF2_ITERATIONS}${salt.hex()}${digest.hex()}"
+
+
+def verify_password(password: str, stored: str) -> bool:
+    """Constant-time check against a PBKDF2 hash or a legacy unsalted sha256 hex digest."""
+    try:
+        if stored.startswith("pbkdf2_sha256$"):
+            _, iterations, salt, expected = stored.split("$")
+            digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), bytes.fromhex(salt), int(iterations)).hex()
+        else:
+            digest, expected = sha256(password), stored
+        return hmac.compare_digest(digest, expected)
+    except (ValueError, TypeError):
+        # malformed/truncated stored hash (or non-ASCII legacy value): reject, don't crash the page
+        return False
+
+
+# verified against when the email is unknown, so a miss costs the same PBKDF2 work as a hit
+_DUMMY_PASSWORD_HASH = f"pbkdf2_sha256${PBKDF2_ITERATIONS}${'00' * 16}${'00' * 32}"
+
+
+def now_ts(t: Optional[time.struct_time] = None) -> str:
+    # local time, formatted straight from a struct_time (no datetime object per insert)
+    return time.strftime("%Y-%m-%d %H:%M:%S", t or time.localtime())
 
 
 def valid_email(email: str) -> bool:
-    return bool(re.match(r"^[^\s@]+@[^\s@]+\.[^\s@]+$", email.strip(), re.I))
+    return bool(EMAIL_RE.match(email.strip()))
 
 
 def year_now() -> int:
-    return dt.datetime.now().year
+    return time.localtime().tm_year
 
 
 def clamp(v: float, lo: float, hi: float) -> float:
@@ -81,127 +291,169 @@ def clamp(v: float, lo: float, hi: float) -> float:
 
 
 def init_db():
-    conn = db()
-    cur = conn.cursor()
-
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS users (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        full_name TEXT NOT NULL,
-        email TEXT NOT NULL UNIQUE,
-        password_hash TEXT NOT NULL,
-        role TEXT NOT NULL,
-        linked_athlete_id TEXT,
-        academy_name TEXT,
-        created_at TEXT NOT NULL
-    )
-    """)
-
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS athlete_profiles (
-        athlete_id TEXT PRIMARY KEY,
-        created_by_user_id INTEGER,
-        full_name TEXT NOT NULL,
-        gender TEXT,
-        birth_year INTEGER,
-        age_group TEXT,
-        sport TEXT,
-        dominant_side TEXT,
-        club TEXT,
-        city TEXT,
-        photo_path TEXT,
-        preferences_json TEXT,
-        created_at TEXT NOT NULL,
-        updated_at TEXT NOT NULL,
-        FOREIGN KEY(created_by_user_id) REFERENCES users(id) ON DELETE SET NULL
-    )
-    """)
-
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS athlete_metrics (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        athlete_id TEXT NOT NULL,
-        metric_name TEXT NOT NULL,
-        metric_value REAL,
-        unit TEXT,
-        measured_at TEXT NOT NULL,
-        source_role TEXT,
-        created_by_user_id INTEGER,
-        notes TEXT,
-        FOREIGN KEY(athlete_id) REFERENCES athlete_profiles(athlete_id) ON DELETE CASCADE,
-        FOREIGN KEY(created_by_user_id) REFERENCES users(id) ON DELETE SET NULL
-    )
-    """)
-
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS uploads (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        athlete_id TEXT NOT NULL,
-        uploaded_by_user_id INTEGER,
-        upload_type TEXT NOT NULL,      -- medical_pdf / photo / video / other
-        title TEXT,
-        file_path TEXT NOT NULL,
-        link_url TEXT,
-        created_at TEXT NOT NULL,
-        FOREIGN KEY(athlete_id) REFERENCES athlete_profiles(athlete_id) ON DELETE CASCADE,
-        FOREIGN KEY(uploaded_by_user_id) REFERENCES users(id) ON DELETE SET NULL
-    )
-    """)
-
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS scout_notes (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        scout_user_id INTEGER NOT NULL,
-        athlete_id TEXT NOT NULL,
-        note TEXT NOT NULL,
-        rating INTEGER,
-        created_at TEXT NOT NULL,
-        FOREIGN KEY(scout_user_id) REFERENCES users(id) ON DELETE CASCADE,
-        FOREIGN KEY(athlete_id) REFERENCES athlete_profiles(athlete_id) ON DELETE CASCADE
-    )
-    """)
-
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS academy_roster (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        academy_user_id INTEGER NOT NULL,
-        athlete_id TEXT NOT NULL,
-        status TEXT DEFAULT 'Active',
-        created_at TEXT NOT NULL,
-        UNIQUE(academy_user_id, athlete_id),
-        FOREIGN KEY(academy_user_id) REFERENCES users(id) ON DELETE CASCADE,
-        FOREIGN KEY(athlete_id) REFERENCES athlete_profiles(athlete_id) ON DELETE CASCADE
-    )
-    """)
-
-    # Scout shortlist
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS scout_shortlist (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        scout_user_id INTEGER NOT NULL,
-        athlete_id TEXT NOT NULL,
-        tag TEXT,
-        priority INTEGER DEFAULT 3, -- 1 high, 5 low
-        created_at TEXT NOT NULL,
-        UNIQUE(scout_user_id, athlete_id),
-        FOREIGN KEY(scout_user_id) REFERENCES users(id) ON DELETE CASCADE,
-        FOREIGN KEY(athlete_id) REFERENCES athlete_profiles(athlete_id) ON DELETE CASCADE
-    )
-    """)
-
-    # Create an admin if none exists (demo only)
-    cur.execute("SELECT COUNT(*) FROM users WHERE role='Admin'")
-    if cur.fetchone()[0] == 0:
+    with db_conn(write=True) as conn:
+        cur = conn.cursor()
+
         cur.execute("""
-        INSERT OR IGNORE INTO users(full_name,email,password_hash,role,created_at)
-        VALUES (?,?,?,?,?)
-        """, ("Admin", "admin@asabig.local", sha256("admin123"), "Admin", now_ts()))
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            full_name TEXT NOT NULL,
+            email TEXT NOT NULL UNIQUE,
+            password_hash TEXT NOT NULL,
+            role TEXT NOT NULL,
+            linked_athlete_id TEXT,
+            academy_name TEXT,
+            created_at TEXT NOT NULL
+        )
+        """)
+
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS athlete_profiles (
+            athlete_id TEXT PRIMARY KEY,
+            created_by_user_id INTEGER,
+            full_name TEXT NOT NULL,
+            gender TEXT,
+            birth_year INTEGER,
+            age_group TEXT,
+            sport TEXT,
+            dominant_side TEXT,
+            club TEXT,
+            city TEXT,
+            photo_path TEXT,
+            preferences_json TEXT,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            FOREIGN KEY(created_by_user_id) REFERENCES users(id) ON DELETE SET NULL
+        )
+        """)
+
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS athlete_metrics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            athlete_id TEXT NOT NULL,
+            metric_name TEXT NOT NULL,
+            metric_value REAL,
+            unit TEXT,
+            measured_at TEXT NOT NULL,
+            source_role TEXT,
+            created_by_user_id INTEGER,
+            notes TEXT,
+            FOREIGN KEY(athlete_id) REFERENCES athlete_profiles(athlete_id) ON DELETE CASCADE,
+            FOREIGN KEY(created_by_user_id) REFERENCES users(id) ON DELETE SET NULL
+        )
+        """)
 
-    conn.commit()
-    conn.close()
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS uploads (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            athlete_id TEXT NOT NULL,
+            uploaded_by_user_id INTEGER,
+            upload_type TEXT NOT NULL,      -- medical_pdf / photo / video / other
+            title TEXT,
+            file_path TEXT NOT NULL,
+            link_url TEXT,
+            created_at TEXT NOT NULL,
+            FOREIGN KEY(athlete_id) REFERENCES athlete_profiles(athlete_id) ON DELETE CASCADE,
+            FOREIGN KEY(uploaded_by_user_id) REFERENCES users(id) ON DELETE SET NULL
+        )
+        """)
 
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS scout_notes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            scout_user_id INTEGER NOT NULL,
+            athlete_id TEXT NOT NULL,
+            note TEXT NOT NULL,
+            rating INTEGER,
+            created_at TEXT NOT NULL,
+            FOREIGN KEY(scout_user_id) REFERENCES users(id) ON DELETE CASCADE,
+            FOREIGN KEY(athlete_id) REFERENCES athlete_profiles(athlete_id) ON DELETE CASCADE
+        )
+        """)
 
-@st.cache_data
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS academy_roster (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            academy_user_id INTEGER NOT NULL,
+            athlete_id TEXT NOT NULL,
+            status TEXT DEFAULT 'Active',
+            created_at TEXT NOT NULL,
+            UNIQUE(academy_user_id, athlete_id),
+            FOREIGN KEY(academy_user_id) REFERENCES users(id) ON DELETE CASCADE,
+            FOREIGN KEY(athlete_id) REFERENCES athlete_profiles(athlete_id) ON DELETE CASCADE
+        )
+        """)
+
+        # Scout shortlist
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS scout_shortlist (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            scout_user_id INTEGER NOT NULL,
+            athlete_id TEXT NOT NULL,
+            tag TEXT,
+            priority INTEGER DEFAULT 3, -- 1 high, 5 low
+            created_at TEXT NOT NULL,
+            UNIQUE(scout_user_id, athlete_id),
+            FOREIGN KEY(scout_user_id) REFERENCES users(id) ON DELETE CASCADE,
+            FOREIGN KEY(athlete_id) REFERENCES athlete_profiles(athlete_id) ON DELETE CASCADE
+        )
+        """)
+
+        # Name-ordered listings (athlete list, academy roster) read this index instead of sorting;
+        # the roster side is covered by its UNIQUE(academy_user_id, athlete_id) index
+        cur.execute("CREATE INDEX IF NOT EXISTS ix_profiles_name ON athlete_profiles(full_name)")
+
+        # Per-athlete reads (latest-first listings, per-metric trends, counts) seek these
+        # instead of scanning the whole child table; they also back ON DELETE CASCADE
+        cur.execute("CREATE INDEX IF NOT EXISTS ix_metrics_athlete_time ON athlete_metrics(athlete_id, measured_at)")
+        cur.execute("CREATE INDEX IF NOT EXISTS ix_metrics_athlete_name ON athlete_metrics(athlete_id, metric_name, measured_at)")
+        cur.execute("CREATE INDEX IF NOT EXISTS ix_uploads_athlete_time ON uploads(athlete_id, created_at)")
+        cur.execute("CREATE INDEX IF NOT EXISTS ix_notes_athlete_time ON scout_notes(athlete_id, created_at)")
+
+        # Full-text index over name/city/sport for the Scout search, kept in sync by triggers;
+        # skipped when this SQLite build has no FTS5 (search then falls back to a substring scan)
+        cur.execute("SELECT 1 FROM sqlite_master WHERE name='athletes_fts'")
+        fts_exists = cur.fetchone() is not None
+        try:
+            cur.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS athletes_fts
+            USING fts5(full_name, city, sport, content='athlete_profiles', content_rowid='rowid')
+            """)
+            cur.executescript("""
+            CREATE TRIGGER IF NOT EXISTS trg_profiles_fts_ai AFTER INSERT ON athlete_profiles BEGIN
+                INSERT INTO athletes_fts(rowid, full_name, city, sport)
+                VALUES (NEW.rowid, NEW.full_name, NEW.city, NEW.sport);
+            END;
+            CREATE TRIGGER IF NOT EXISTS trg_profiles_fts_ad AFTER DELETE ON athlete_profiles BEGIN
+                INSERT INTO athletes_fts(athletes_fts, rowid, full_name, city, sport)
+                VALUES ('delete', OLD.rowid, OLD.full_name, OLD.city, OLD.sport);
+            END;
+            CREATE TRIGGER IF NOT EXISTS trg_profiles_fts_au AFTER UPDATE ON athlete_profiles BEGIN
+                INSERT INTO athletes_fts(athletes_fts, rowid, full_name, city, sport)
+                VALUES ('delete', OLD.rowid, OLD.full_name, OLD.city, OLD.sport);
+                INSERT INTO athletes_fts(rowid, full_name, city, sport)
+                VALUES (NEW.rowid, NEW.full_name, NEW.city, NEW.sport);
+            END;
+            """)
+            if not fts_exists:
+                cur.execute("INSERT INTO athletes_fts(athletes_fts) VALUES ('rebuild')")
+        except sqlite3.OperationalError:
+            pass
+
+        # Create an admin if none exists (demo only)
+        cur.execute("SELECT COUNT(*) FROM users WHERE role='Admin'")
+        if cur.fetchone()[0] == 0:
+            cur.execute("""
+            INSERT OR IGNORE INTO users(full_name,email,password_hash,role,created_at)
+            VALUES (?,?,?,?,?)
+            """, ("Admin", "admin@asabig.local", hash_password("admin123"), "Admin", now_ts()))
+
+        conn.commit()
+        # gathers planner stats for any index that lacks them (cheap no-op otherwise)
+        conn.execute("PRAGMA optimize")
+
+
+@st.cache_data(show_spinner=False)
 def load_csv(name: str) -> Optional[pd.DataFrame]:
     filename = DATA_FILES.get(name)
     if not filename:
@@ -210,9 +462,74 @@ def load_csv(name: str) -> Optional[pd.DataFrame]:
     if not path.exists():
         return None
     try:
-        return pd.read_csv(path)
+        # pyarrow's multithreaded parser; anything it rejects goes through the C engine as before
+        df = pd.read_csv(path, engine="pyarrow")
     except Exception:
-        return pd.read_csv(path, encoding="utf-8", errors="ignore")
+        try:
+            df = pd.read_csv(path)
+        except Exception:
+            df = pd.read_csv(path, encoding="utf-8", errors="ignore")
+    for c in df.columns:
+        if c.lower() in CATEGORY_COLUMN_KEYS:
+            df[c] = df[c].astype("category")
+        elif pd.api.types.is_integer_dtype(df[c]):
+            # e.g. birth_year int64 -> int16 (floats are left alone so displayed values don't change)
+            df[c] = pd.to_numeric(df[c], downcast="integer")
+        elif df[c].dtype == "object":
+            # mixed/None text -> string dtype, so safe_df() passes the frame through untouched
+            df[c] = df[c].astype("string")
+    return df
+
+
+@st.cache_data(show_spinner=False)
+def filter_options(name: str) -> Tuple[Optional[str], Optional[str], List[str], List[str]]:
+    """
+    Filter columns + their option lists for a dataset:
+    (age_col, gender_col, age_options, gender_options)
+    """
+    df = load_csv(name)
+    if df is None:
+        return None, None, [], []
+    age_col = next((c for c in df.columns if c.lower() in AGE_COLUMN_KEYS), None)
+    gender_col = next((c for c in df.columns if c.lower() in GENDER_COLUMN_KEYS), None)
+    # categories are already the sorted distinct values (see load_csv)
+    age_opts = df[age_col].cat.categories.astype(str).tolist() if age_col else []
+    gender_opts = df[gender_col].cat.categories.astype(str).tolist() if gender_col else []
+    return age_col, gender_col, age_opts, gender_opts
+
+
+@st.cache_data(show_spinner=False)
+def filtered_dataset(name: str, age_val: str, gender_val: str) -> pd.DataFrame:
+    """Display-ready (safe_df) view of a dataset for one filter combination."""
+    df = load_csv(name)
+    if df is None:
+        return pd.DataFrame()
+    age_col, gender_col, _, _ = filter_options(name)
+    # both filter columns are categoricals: compare int codes in one mask, no per-row strings
+    mask = np.ones(len(df), dtype=bool)
+    if age_col and age_val != "All":
+        mask &= category_mask(df[age_col], age_val)
+    if gender_col and gender_val != "All":
+        mask &= category_mask(df[gender_col], gender_val)
+    return safe_df(df if mask.all() else df[mask])
+
+
+@st.cache_data(show_spinner=False)
+def numeric_columns(name: str) -> List[str]:
+    df = load_csv(name)
+    return [] if df is None else df.select_dtypes(include=["number"]).columns.tolist()
+
+
+@st.cache_data(show_spinner=False)
+def dataset_summary(name: str, age_val: str, gender_val: str) -> Optional[pd.DataFrame]:
+    """numeric_summary() of one filtered view, or None when it has no numeric data."""
+    nums = filtered_dataset(name, age_val, gender_val)[numeric_columns(name)]
+    return None if nums.empty else numeric_summary(nums)
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def data_file_status() -> Dict[str, bool]:
+    return {f: (BASE_DIR / f).exists() for f in DATA_FILES.values()}
 
 
 def ensure_demo_profiles_from_csv():
@@ -220,10 +537,6 @@ def ensure_demo_profiles_from_csv():
     if demo is None or demo.empty:
         return
 
-    demo = safe_df(demo)
-    conn = db()
-    cur = conn.cursor()
-
     cols = {c.lower(): c for c in demo.columns}
 
     def col(*names):
@@ -242,148 +555,249 @@ def ensure_demo_profiles_from_csv():
     city = col("city")
 
     if not a_id or not full_name:
-        conn.close()
         return
 
-    for _, r in demo.iterrows():
-        athlete_id = str(r.get(a_id, "")).strip()
-        if not athlete_id:
-            continue
-
-        by = r.get(birth_year, "")
-        try:
-            by_int = int(str(by).strip()) if str(by).strip() else None
-        except Exception:
-            by_int = None
-
-        ag = None
-        if by_int:
-            age = year_now() - by_int
-            if age <= 10:
-                ag = "U10"
-            elif age <= 14:
-                ag = "U14"
-            elif age <= 17:
-                ag = "U17"
-            else:
-                ag = "U23"
+    def text(c):
+        if not c:
+            return None
+        return demo[c].astype("string").fillna("").str.strip()
+
+    by = pd.to_numeric(text(birth_year), errors="coerce") if birth_year else pd.Series(np.nan, index=demo.index)
+    by = by.where(by % 1 == 0)
+    ag = pd.cut(year_now() - by, bins=[-np.inf, 10, 14, 17, np.inf], labels=AGE_GROUPS)
+
+    ids = text(a_id)
+    names = text(full_name)
+    stage = pd.DataFrame({
+        "athlete_id": ids,
+        "full_name": names.where(names != "", ids),
+        "gender": text(gender).str[:1].str.upper() if gender else None,
+        "birth_year": by.astype("Int64"),
+        "age_group": ag.astype(object).where(ag.notna(), None),
+        "sport": text(sport),
+        "dominant_side": text(dom),
+        "club": text(club),
+        "city": text(city),
+    })
+    stage = stage[stage["athlete_id"] != ""]
+    if stage.empty:
+        return
 
-        cur.execute("""
+    # one batched insert in a single transaction (existing ids are kept)
+    ts = now_ts()
+    stage = stage.assign(created_at=ts, updated_at=ts)
+    rows = stage.astype(object).where(stage.notna(), None).itertuples(index=False, name=None)
+    inserted = db_executemany("""
         INSERT OR IGNORE INTO athlete_profiles(
-            athlete_id, created_by_user_id, full_name, gender, birth_year, age_group,
-            sport, dominant_side, club, city, photo_path, preferences_json, created_at, updated_at
-        ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)
-        """, (
-            athlete_id,
-            None,
-            str(r.get(full_name, "")).strip() or athlete_id,
-            (str(r.get(gender, "")).strip()[:1].upper() if gender else None),
-            by_int,
-            ag,
-            (str(r.get(sport, "")).strip() if sport else None),
-            (str(r.get(dom, "")).strip() if dom else None),
-            (str(r.get(club, "")).strip() if club else None),
-            (str(r.get(city, "")).strip() if city else None),
-            None,
-            None,
-            now_ts(),
-            now_ts(),
-        ))
-
-    conn.commit()
-    conn.close()
+            athlete_id, full_name, gender, birth_year, age_group,
+            sport, dominant_side, club, city, created_at, updated_at
+        )
+        VALUES (?,?,?,?,?,?,?,?,?,?,?)
+    """, rows)
+    if inserted:
+        with db_conn(write=True) as conn:
+            conn.execute("ANALYZE")  # refresh planner stats after the bulk load
+        _clear_athlete_caches()
 
 
 def get_user_by_email(email: str):
-    conn = db()
-    cur = conn.cursor()
-    cur.execute("SELECT id, full_name, email, password_hash, role, linked_athlete_id, academy_name FROM users WHERE email=?",
-                (email.strip().lower(),))
-    row = cur.fetchone()
-    conn.close()
-    return row
+    with db_conn() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT id, full_name, email, password_hash, role, linked_athlete_id, academy_name FROM users WHERE email=?",
+                    (email.strip().lower(),))
+        row = cur.fetchone()
+        return row
 
 
 def get_user_by_id(user_id: int):
-    conn = db()
-    cur = conn.cursor()
-    cur.execute("SELECT id, full_name, email, password_hash, role, linked_athlete_id, academy_name FROM users WHERE id=?",
-                (user_id,))
-    row = cur.fetchone()
-    conn.close()
-    return row
+    with db_conn() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT id, full_name, email, password_hash, role, linked_athlete_id, academy_name FROM users WHERE id=?",
+                    (user_id,))
+        row = cur.fetchone()
+        return row
 
 
 def create_user(full_name: str, email: str, password: str, role: str,
                 linked_athlete_id: Optional[str], academy_name: Optional[str]):
-    conn = db()
-    cur = conn.cursor()
-    cur.execute("""
-    INSERT INTO users(full_name,email,password_hash,role,linked_athlete_id,academy_name,created_at)
-    VALUES (?,?,?,?,?,?,?)
-    """, (full_name.strip(), email.strip().lower(), sha256(password), role, linked_athlete_id, academy_name, now_ts()))
-    conn.commit()
-    conn.close()
+    with db_conn(write=True) as conn:
+        cur = conn.cursor()
+        cur.execute("""
+        INSERT INTO users(full_name,email,password_hash,role,linked_athlete_id,academy_name,created_at)
+        VALUES (?,?,?,?,?,?,?)
+        """, (full_name.strip(), email.strip().lower(), hash_password(password), role, linked_athlete_id, academy_name, now_ts()))
+        conn.commit()
+        list_users_db.clear()
+        count_users.clear()
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def list_users_db(before_id: int = USERS_CURSOR_START, limit: int = USERS_PAGE_SIZE) -> pd.DataFrame:
+    # keyset page on the primary key: newest first, only `limit` rows per render
+    with db_conn() as conn:
+        df = query_df(
+            "SELECT id, full_name, email, role, linked_athlete_id, academy_name, created_at FROM users "
+            "WHERE id < ? ORDER BY id DESC LIMIT ?",
+            conn, params=(before_id, limit)
+        )
+        return safe_df(df)
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def count_users() -> int:
+    with db_conn() as conn:
+        return conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
 
 
 def current_user():
     uid = st.session_state.get("user_id")
     if not uid:
         return None
-    return get_user_by_id(uid)
+    # cached on login so reruns don't query the users table each time
+    row = st.session_state.get("_user_row")
+    if row is None:
+        row = get_user_by_id(uid)
+        st.session_state["_user_row"] = row
+    return row
 
 
 def login(email: str, password: str) -> bool:
     u = get_user_by_email(email)
     if not u:
+        verify_password(password, _DUMMY_PASSWORD_HASH)
         return False
-    if sha256(password) != u[3]:
+    if not verify_password(password, u[3]):
         return False
+    if not u[3].startswith("pbkdf2_sha256$"):
+        # upgrade legacy sha256 hashes on the first successful login
+        with db_conn(write=True) as conn:
+            conn.execute("UPDATE users SET password_hash=? WHERE id=?", (hash_password(password), u[0]))
+            conn.commit()
     st.session_state["user_id"] = u[0]
+    st.session_state["_user_row"] = u
     return True
 
 
 def logout():
     st.session_state.pop("user_id", None)
+    st.session_state.pop("_user_row", None)
 
 
+@st.cache_data(ttl=60, show_spinner=False)
 def list_athletes_db() -> pd.DataFrame:
-    conn = db()
-    df = pd.read_sql_query("""
-        SELECT athlete_id, full_name, gender, birth_year, age_group, sport, dominant_side, club, city
-        FROM athlete_profiles
-        ORDER BY full_name
-    """, conn)
-    conn.close()
-    return safe_df(df)
+    with db_conn() as conn:
+        df = query_df("""
+            SELECT athlete_id, full_name, gender, birth_year, age_group, sport, dominant_side, club, city
+            FROM athlete_profiles
+            ORDER BY full_name
+        """, conn)
+        return safe_df(df)
 
 
-def get_athlete(athlete_id: str) -> Optional[dict]:
-    conn = db()
-    cur = conn.cursor()
-    cur.execute("""
-    SELECT athlete_id, full_name, gender, birth_year, age_group, sport, dominant_side, club, city, photo_path, preferences_json, created_at, updated_at
-    FROM athlete_profiles WHERE athlete_id=?
-    """, (athlete_id,))
-    r = cur.fetchone()
-    conn.close()
-    if not r:
-        return None
-    keys = ["athlete_id", "full_name", "gender", "birth_year", "age_group", "sport", "dominant_side",
-            "club", "city", "photo_path", "preferences_json", "created_at", "updated_at"]
-    return dict(zip(keys, r))
+@st.cache_data(ttl=60, show_spinner=False)
+def athlete_names() -> Tuple[List[str], Dict[str, str]]:
+    """athlete_name_index() of the full athlete list, built once per cache period."""
+    return athlete_name_index(list_athletes_db())
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def athlete_filter_options() -> Dict[str, List[str]]:
+    """Sorted distinct sport / age_group / city values for the Scout filters."""
+    df = list_athletes_db()
+    return {c: sorted(df[c].dropna().unique().tolist()) for c in ("sport", "age_group", "city")}
 
 
-def upsert_athlete_profile(athlete_id: str, data: dict, created_by_user_id: Optional[int]):
-    existing = get_athlete(athlete_id)
-    conn = db()
-    cur = conn.cursor()
-    if not existing:
+@st.cache_data(ttl=60, show_spinner=False)
+def search_athletes(q: str, sport: Optional[str] = None, age_group: Optional[str] = None,
+                    city: Optional[str] = None, limit: int = SEARCH_LIMIT) -> pd.DataFrame:
+    """
+    Search over name/city/sport, same columns as list_athletes_db().
+    Union of athletes_fts prefix hits (every word, any order) and an instr() substring match
+    (e.g. "ri" inside "Almutairi"); substring only when the query has no word characters or
+    this SQLite build lacks FTS5. sport/age_group/city (None = any) are applied in SQL, so
+    `limit` counts rows that pass every filter.
+    """
+    terms = WORD_RE.findall(q)
+    filters = (sport, sport, age_group, age_group, city, city)
+    with db_conn() as conn:
+        if terms:
+            match = " ".join(f'"{t}"*' for t in terms)
+            try:
+                return safe_df(query_df("""
+                    SELECT athlete_id, full_name, gender, birth_year, age_group, sport, dominant_side, club, city
+                    FROM athlete_profiles
+                    WHERE (rowid IN (SELECT rowid FROM athletes_fts WHERE athletes_fts MATCH ?)
+                           OR instr(lower(full_name || ' ' || ifnull(city, '') || ' ' || ifnull(sport, '')), ?) > 0)
+                      AND (? IS NULL OR sport = ?) AND (? IS NULL OR age_group = ?) AND (? IS NULL OR city = ?)
+                    ORDER BY full_name
+                    LIMIT ?
+                """, conn, params=(match, q.lower(), *filters, limit)))
+            except sqlite3.OperationalError:
+                pass  # no athletes_fts table
+        return safe_df(query_df("""
+            SELECT athlete_id, full_name, gender, birth_year, age_group, sport, dominant_side, club, city
+            FROM athlete_profiles
+            WHERE instr(lower(full_name || ' ' || ifnull(city, '') || ' ' || ifnull(sport, '')), ?) > 0
+              AND (? IS NULL OR sport = ?) AND (? IS NULL OR age_group = ?) AND (? IS NULL OR city = ?)
+            ORDER BY full_name
+            LIMIT ?
+        """, conn, params=(q.lower(), *filters, limit)))
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def get_athlete(athlete_id: str) -> Optional[dict]:
+    with db_conn() as conn:
+        cur = conn.cursor()
+        cur.execute("""
+        SELECT athlete_id, full_name, gender, birth_year, age_group, sport, dominant_side, club, city, photo_path, preferences_json, created_at, updated_at
+        FROM athlete_profiles WHERE athlete_id=?
+        """, (athlete_id,))
+        r = cur.fetchone()
+        if not r:
+            return None
+        keys = ["athlete_id", "full_name", "gender", "birth_year", "age_group", "sport", "dominant_side",
+                "club", "city", "photo_path", "preferences_json", "created_at", "updated_at"]
+        return dict(zip(keys, r))
+
+
+def _clear_athlete_caches():
+    """Every cached read that shows athlete profile fields; call after any profile write."""
+    list_athletes_db.clear()
+    athlete_names.clear()
+    athlete_filter_options.clear()
+    search_athletes.clear()
+    get_athlete.clear()
+    athletes_csv_bytes.clear()
+    academy_roster.clear()
+    scout_shortlist_df.clear()
+
+
+def upsert_athlete_profile(athlete_id: str, data: dict, created_by_user_id: Optional[int],
+                           link_to_user_id: Optional[int] = None):
+    """
+    Insert/update an athlete profile. With link_to_user_id, the user's
+    linked_athlete_id is set in the same transaction (only if still unset).
+    """
+    ts = now_ts()
+    with db_conn(write=True) as conn:
+        cur = conn.cursor()
         cur.execute("""
         INSERT INTO athlete_profiles(
             athlete_id, created_by_user_id, full_name, gender, birth_year, age_group,
             sport, dominant_side, club, city, photo_path, preferences_json, created_at, updated_at
         ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)
+        ON CONFLICT(athlete_id) DO UPDATE SET
+            full_name=excluded.full_name,
+            gender=excluded.gender,
+            birth_year=excluded.birth_year,
+            age_group=excluded.age_group,
+            sport=excluded.sport,
+            dominant_side=excluded.dominant_side,
+            club=excluded.club,
+            city=excluded.city,
+            photo_path=excluded.photo_path,
+            preferences_json=excluded.preferences_json,
+            updated_at=excluded.updated_at
         """, (
             athlete_id,
             created_by_user_id,
@@ -397,56 +811,72 @@ def upsert_athlete_profile(athlete_id: str, data: dict, created_by_user_id: Opti
             data.get("city"),
             data.get("photo_path"),
             data.get("preferences_json"),
-            now_ts(),
-            now_ts(),
+            ts,
+            ts,
         ))
-    else:
-        cur.execute("""
-        UPDATE athlete_profiles SET
-            full_name=?, gender=?, birth_year=?, age_group=?, sport=?, dominant_side=?, club=?, city=?,
-            photo_path=?, preferences_json=?, updated_at=?
-        WHERE athlete_id=?
-        """, (
-            data.get("full_name"),
-            data.get("gender"),
-            data.get("birth_year"),
-            data.get("age_group"),
-            data.get("sport"),
-            data.get("dominant_side"),
-            data.get("club"),
-            data.get("city"),
-            data.get("photo_path"),
-            data.get("preferences_json"),
-            now_ts(),
-            athlete_id
-        ))
-    conn.commit()
-    conn.close()
+        if link_to_user_id is not None:
+            cur.execute("""
+            UPDATE users SET linked_athlete_id=?
+            WHERE id=? AND (linked_athlete_id IS NULL OR linked_athlete_id='')
+            """, (athlete_id, link_to_user_id))
+            list_users_db.clear()
+        conn.commit()
+        _clear_athlete_caches()
+
+
+def set_athlete_photo(athlete_id: str, photo_path: str):
+    with db_conn(write=True) as conn:
+        conn.execute("UPDATE athlete_profiles SET photo_path=?, updated_at=? WHERE athlete_id=?",
+                     (photo_path, now_ts(), athlete_id))
+        conn.commit()
+    get_athlete.clear()
+    photo_exists.clear()
 
 
 def add_metric(athlete_id: str, metric_name: str, metric_value: float, unit: str, measured_at: str,
                source_role: str, created_by_user_id: Optional[int], notes: str):
-    conn = db()
-    cur = conn.cursor()
-    cur.execute("""
-    INSERT INTO athlete_metrics(athlete_id, metric_name, metric_value, unit, measured_at, source_role, created_by_user_id, notes)
-    VALUES (?,?,?,?,?,?,?,?)
-    """, (athlete_id, metric_name, metric_value, unit, measured_at, source_role, created_by_user_id, notes))
-    conn.commit()
-    conn.close()
+    with db_conn(write=True) as conn:
+        cur = conn.cursor()
+        cur.execute("""
+        INSERT INTO athlete_metrics(athlete_id, metric_name, metric_value, unit, measured_at, source_role, created_by_user_id, notes)
+        VALUES (?,?,?,?,?,?,?,?)
+        """, (athlete_id, metric_name, metric_value, unit, measured_at, source_role, created_by_user_id, notes))
+        conn.commit()
+        list_metrics.clear()
+        count_metrics.clear()
+        metric_trend.clear()
+        metric_names_for.clear()
 
 
+@st.cache_data(ttl=60, show_spinner=False)
 def list_metrics(athlete_id: str, limit: int = 300) -> pd.DataFrame:
-    conn = db()
-    df = pd.read_sql_query("""
-        SELECT measured_at, metric_name, metric_value, unit, source_role, notes
-        FROM athlete_metrics
-        WHERE athlete_id=?
-        ORDER BY measured_at DESC
-        LIMIT ?
-    """, conn, params=(athlete_id, limit))
-    conn.close()
-    return safe_df(df)
+    with db_conn() as conn:
+        df = query_df("""
+            SELECT measured_at, metric_name, metric_value, unit, source_role, notes
+            FROM athlete_metrics
+            WHERE athlete_id=?
+            ORDER BY measured_at DESC
+            LIMIT ?
+        """, conn, params=(athlete_id, limit))
+        return safe_df(df)
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def count_metrics(athlete_id: str) -> int:
+    with db_conn() as conn:
+        return conn.execute("SELECT COUNT(*) FROM athlete_metrics WHERE athlete_id=?", (athlete_id,)).fetchone()[0]
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def metric_names_for(athlete_ids: Tuple[str, ...]) -> List[str]:
+    """Sorted distinct metric names recorded for any of the given athletes (one query)."""
+    with db_conn() as conn:
+        rows = conn.execute("""
+            SELECT DISTINCT metric_name FROM athlete_metrics
+            WHERE athlete_id IN (SELECT value FROM json_each(?))
+            ORDER BY metric_name
+        """, (json.dumps(list(athlete_ids)),)).fetchall()
+        return [r[0] for r in rows]
 
 
 def metrics_pivot_latest(athlete_id: str) -> pd.DataFrame:
@@ -459,147 +889,204 @@ def metrics_pivot_latest(athlete_id: str) -> pd.DataFrame:
     return df2[["metric_name", "metric_value", "unit", "measured_at"]].reset_index(drop=True)
 
 
+@st.cache_data(ttl=60, show_spinner=False)
 def metric_trend(athlete_id: str, metric_name: str) -> pd.DataFrame:
-    conn = db()
-    df = pd.read_sql_query("""
-        SELECT measured_at, metric_value
-        FROM athlete_metrics
-        WHERE athlete_id=? AND metric_name=?
-        ORDER BY measured_at ASC
-        LIMIT 300
-    """, conn, params=(athlete_id, metric_name))
-    conn.close()
-    return safe_df(df)
+    with db_conn() as conn:
+        df = query_df("""
+            SELECT measured_at, metric_value
+            FROM athlete_metrics
+            WHERE athlete_id=? AND metric_name=?
+            ORDER BY measured_at ASC
+            LIMIT 300
+        """, conn, params=(athlete_id, metric_name))
+        return safe_df(df)
 
 
 def save_upload(athlete_id: str, upload_type: str, title: str,
-                file_bytes: Optional[bytes], filename: Optional[str],
+                file_obj: Optional[BinaryIO], filename: Optional[str],
                 link_url: Optional[str], uploaded_by_user_id: Optional[int]) -> Optional[str]:
     athlete_folder = UPLOADS_DIR / athlete_id / upload_type
     athlete_folder.mkdir(parents=True, exist_ok=True)
 
+    ns = time.time_ns()  # one clock read for both the file prefix and created_at
+    now = time.localtime(ns // 1_000_000_000)
     file_path = ""
-    if file_bytes and filename:
-        safe_name = re.sub(r"[^a-zA-Z0-9._-]+", "_", filename)
-        ts = dt.datetime.now().strftime("%Y%m%d_%H%M%S")
+    if file_obj is not None and filename:
+        safe_name = UNSAFE_FILENAME_RE.sub("_", filename)
+        # microsecond prefix: same-second uploads of one filename no longer overwrite each other,
+        # and names still sort in upload order
+        ts = time.strftime("%Y%m%d_%H%M%S", now) + f"_{ns // 1000 % 1_000_000:06d}"
         file_path = str(athlete_folder / f"{ts}_{safe_name}")
-        with open(file_path, "wb") as f:
-            f.write(file_bytes)
-
-    conn = db()
-    cur = conn.cursor()
-    cur.execute("""
-    INSERT INTO uploads(athlete_id, uploaded_by_user_id, upload_type, title, file_path, link_url, created_at)
-    VALUES (?,?,?,?,?,?,?)
-    """, (
-        athlete_id,
-        uploaded_by_user_id,
-        upload_type,
-        title,
-        file_path if file_path else str(athlete_folder / "LINK_ONLY"),
-        link_url,
-        now_ts()
-    ))
-    conn.commit()
-    conn.close()
-    return file_path if file_path else None
+        # copy in 1 MB chunks; never holds a second full copy of the upload in memory
+        file_obj.seek(0)
+        with open(file_path, "xb") as f:
+            shutil.copyfileobj(file_obj, f, length=1 << 20)
+
+    with db_conn(write=True) as conn:
+        cur = conn.cursor()
+        cur.execute("""
+        INSERT INTO uploads(athlete_id, uploaded_by_user_id, upload_type, title, file_path, link_url, created_at)
+        VALUES (?,?,?,?,?,?,?)
+        """, (
+            athlete_id,
+            uploaded_by_user_id,
+            upload_type,
+            title,
+            file_path if file_path else str(athlete_folder / "LINK_ONLY"),
+            link_url,
+            now_ts(now)
+        ))
+        conn.commit()
+        list_uploads.clear()
+        upload_types.clear()
+        return file_path if file_path else None
+
+
+@st.cache_data(ttl=600, max_entries=32, show_spinner=False)
+def _photo_file_bytes(path: str, mtime_ns: int, size: int) -> bytes:
+    # mtime/size are part of the key, so a file replaced in place is read again
+    return Path(path).read_bytes()
+
+
+def photo_bytes(path: str) -> Optional[bytes]:
+    """Photo file contents from a small bounded cache; missing files are not cached."""
+    try:
+        info = os.stat(path)
+    except OSError:
+        return None
+    return _photo_file_bytes(path, info.st_mtime_ns, info.st_size)
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def photo_exists(path: str) -> bool:
+    # completion scoring checks this on every rerun; one stat() per path per 5 minutes
+    return bool(path) and Path(path).exists()
 
 
+@st.cache_data(ttl=60, show_spinner=False)
 def list_uploads(athlete_id: str, limit: int = 200) -> pd.DataFrame:
-    conn = db()
-    df = pd.read_sql_query("""
-        SELECT created_at, upload_type, title, file_path, link_url
-        FROM uploads
-        WHERE athlete_id=?
-        ORDER BY created_at DESC
-        LIMIT ?
-    """, conn, params=(athlete_id, limit))
-    conn.close()
-    return safe_df(df)
+    with db_conn() as conn:
+        df = query_df("""
+            SELECT created_at, upload_type, title, file_path, link_url
+            FROM uploads
+            WHERE athlete_id=?
+            ORDER BY created_at DESC
+            LIMIT ?
+        """, conn, params=(athlete_id, limit))
+        return safe_df(df)
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def upload_types(athlete_id: str) -> frozenset:
+    with db_conn() as conn:
+        rows = conn.execute("SELECT DISTINCT upload_type FROM uploads WHERE athlete_id=?", (athlete_id,)).fetchall()
+        return frozenset(r[0] for r in rows)
 
 
 def add_scout_note(scout_user_id: int, athlete_id: str, note: str, rating: Optional[int]):
-    conn = db()
-    cur = conn.cursor()
-    cur.execute("""
-    INSERT INTO scout_notes(scout_user_id, athlete_id, note, rating, created_at)
-    VALUES (?,?,?,?,?)
-    """, (scout_user_id, athlete_id, note, rating, now_ts()))
-    conn.commit()
-    conn.close()
-
-
-def list_scout_notes(athlete_id: str, limit: int = 200) -> pd.DataFrame:
-    conn = db()
-    df = pd.read_sql_query("""
-        SELECT created_at, note, rating
-        FROM scout_notes
-        WHERE athlete_id=?
-        ORDER BY created_at DESC
-        LIMIT ?
-    """, conn, params=(athlete_id, limit))
-    conn.close()
-    return safe_df(df)
+    with db_conn(write=True) as conn:
+        cur = conn.cursor()
+        cur.execute("""
+        INSERT INTO scout_notes(scout_user_id, athlete_id, note, rating, created_at)
+        VALUES (?,?,?,?,?)
+        """, (scout_user_id, athlete_id, note, rating, now_ts()))
+        conn.commit()
+        list_scout_notes.clear()
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def list_scout_notes(athlete_id: str, limit: int = 200) -> pa.Table:
+    with db_conn() as conn:
+        return query_table("""
+            SELECT created_at, note, rating
+            FROM scout_notes
+            WHERE athlete_id=?
+            ORDER BY created_at DESC
+            LIMIT ?
+        """, conn, params=(athlete_id, limit))
 
 
 def academy_add_roster(academy_user_id: int, athlete_id: str):
-    conn = db()
-    cur = conn.cursor()
-    cur.execute("""
-    INSERT OR IGNORE INTO academy_roster(academy_user_id, athlete_id, status, created_at)
-    VALUES (?,?,?,?)
-    """, (academy_user_id, athlete_id, "Active", now_ts()))
-    conn.commit()
-    conn.close()
+    academy_add_roster_bulk(academy_user_id, [athlete_id])
+
 
+def academy_add_roster_bulk(academy_user_id: int, athlete_ids: List[str]) -> int:
+    """Add many athletes in one transaction; unknown ids and existing entries are skipped."""
+    ts = now_ts()
+    added = db_executemany("""
+        INSERT OR IGNORE INTO academy_roster(academy_user_id, athlete_id, status, created_at)
+        SELECT ?, athlete_id, 'Active', ? FROM athlete_profiles WHERE athlete_id=?
+    """, [(academy_user_id, ts, aid) for aid in dict.fromkeys(athlete_ids)])
+    academy_roster.clear()
+    return added
 
+
+@st.cache_data(ttl=60, show_spinner=False)
 def academy_roster(academy_user_id: int) -> pd.DataFrame:
-    conn = db()
-    df = pd.read_sql_query("""
-        SELECT r.created_at, r.status, a.athlete_id, a.full_name, a.sport, a.age_group, a.city, a.gender
-        FROM academy_roster r
-        JOIN athlete_profiles a ON a.athlete_id = r.athlete_id
-        WHERE r.academy_user_id=?
-        ORDER BY a.full_name
-    """, conn, params=(academy_user_id,))
-    conn.close()
-    return safe_df(df)
+    with db_conn() as conn:
+        df = query_df("""
+            SELECT r.created_at, r.status, a.athlete_id, a.full_name, a.sport, a.age_group, a.city, a.gender
+            FROM academy_roster r
+            JOIN athlete_profiles a ON a.athlete_id = r.athlete_id
+            WHERE r.academy_user_id=?
+            ORDER BY a.full_name
+        """, conn, params=(academy_user_id,))
+        return safe_df(df)
 
 
 def scout_toggle_shortlist(scout_user_id: int, athlete_id: str, tag: str = "", priority: int = 3):
-    conn = db()
-    cur = conn.cursor()
-    # insert or update
-    cur.execute("""
-    INSERT INTO scout_shortlist(scout_user_id, athlete_id, tag, priority, created_at)
-    VALUES (?,?,?,?,?)
-    ON CONFLICT(scout_user_id, athlete_id) DO UPDATE SET
-        tag=excluded.tag,
-        priority=excluded.priority
-    """, (scout_user_id, athlete_id, tag, int(priority), now_ts()))
-    conn.commit()
-    conn.close()
+    with db_conn(write=True) as conn:
+        cur = conn.cursor()
+        # insert or update
+        cur.execute("""
+        INSERT INTO scout_shortlist(scout_user_id, athlete_id, tag, priority, created_at)
+        VALUES (?,?,?,?,?)
+        ON CONFLICT(scout_user_id, athlete_id) DO UPDATE SET
+            tag=excluded.tag,
+            priority=excluded.priority
+        """, (scout_user_id, athlete_id, tag, int(priority), now_ts()))
+        conn.commit()
+    scout_shortlist_df.clear()
 
 
 def scout_remove_shortlist(scout_user_id: int, athlete_id: str):
-    conn = db()
-    cur = conn.cursor()
-    cur.execute("DELETE FROM scout_shortlist WHERE scout_user_id=? AND athlete_id=?", (scout_user_id, athlete_id))
-    conn.commit()
-    conn.close()
-
-
-def scout_shortlist_df(scout_user_id: int) -> pd.DataFrame:
-    conn = db()
-    df = pd.read_sql_query("""
-        SELECT s.created_at, s.priority, s.tag, a.athlete_id, a.full_name, a.sport, a.age_group, a.city, a.gender
-        FROM scout_shortlist s
-        JOIN athlete_profiles a ON a.athlete_id = s.athlete_id
-        WHERE s.scout_user_id=?
-        ORDER BY s.priority ASC, a.full_name ASC
-    """, conn, params=(scout_user_id,))
-    conn.close()
-    return safe_df(df)
+    with db_conn(write=True) as conn:
+        cur = conn.cursor()
+        cur.execute("DELETE FROM scout_shortlist WHERE scout_user_id=? AND athlete_id=?", (scout_user_id, athlete_id))
+        conn.commit()
+    scout_shortlist_df.clear()
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def scout_shortlist_df(scout_user_id: int) -> pa.Table:
+    with db_conn() as conn:
+        return query_table("""
+            SELECT s.created_at, s.priority, s.tag, a.athlete_id, a.full_name, a.sport, a.age_group, a.city, a.gender
+            FROM scout_shortlist s
+            JOIN athlete_profiles a ON a.athlete_id = s.athlete_id
+            WHERE s.scout_user_id=?
+            ORDER BY s.priority ASC, a.full_name ASC
+        """, conn, params=(scout_user_id,))
+
+
+EXPORT_QUERIES = {
+    "metrics": "SELECT athlete_id, metric_name, metric_value, unit, measured_at, source_role, notes FROM athlete_metrics ORDER BY measured_at DESC",
+    "uploads": "SELECT athlete_id, upload_type, title, file_path, link_url, created_at FROM uploads ORDER BY created_at DESC",
+    "scout_shortlist": "SELECT scout_user_id, athlete_id, tag, priority, created_at FROM scout_shortlist ORDER BY created_at DESC",
+}
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def export_csv_bytes(name: str) -> bytes:
+    with db_conn() as conn:
+        df = query_df(EXPORT_QUERIES[name], conn)
+        return safe_df(df).to_csv(index=False).encode("utf-8")
+
+
+@st.cache_data(show_spinner=False)
+def athletes_csv_bytes() -> bytes:
+    # no ttl: cleared together with list_athletes_db on every profile write
+    return list_athletes_db().to_csv(index=False).encode("utf-8")
 
 
 def completion_score(athlete_id: str) -> Tuple[int, Dict[str, int]]:
@@ -610,9 +1097,36 @@ def completion_score(athlete_id: str) -> Tuple[int, Dict[str, int]]:
     - Uploads (15)
     """
     a = get_athlete(athlete_id) or {}
-    uploads = list_uploads(athlete_id, limit=500)
-    metrics = list_metrics(athlete_id, limit=500)
-
+    return _score_completion(a, count_metrics(athlete_id), upload_types(athlete_id))
+
+
+def completion_scores(athlete_ids: pd.Series) -> pd.Series:
+    """completion_score() totals for a column of athlete ids, from three set-based queries."""
+    ids = athlete_ids.astype(str)
+    wanted = json.dumps(ids.unique().tolist())
+    with db_conn() as conn:
+        cur = conn.execute("""
+            SELECT athlete_id, full_name, gender, birth_year, age_group, sport, dominant_side, club, city, photo_path
+            FROM athlete_profiles WHERE athlete_id IN (SELECT value FROM json_each(?))
+        """, (wanted,))
+        cols = [d[0] for d in cur.description]
+        profiles = {r[0]: dict(zip(cols, r)) for r in cur.fetchall()}
+        counts = dict(conn.execute("""
+            SELECT athlete_id, COUNT(*) FROM athlete_metrics
+            WHERE athlete_id IN (SELECT value FROM json_each(?)) GROUP BY athlete_id
+        """, (wanted,)).fetchall())
+        types: Dict[str, set] = {}
+        for aid, t in conn.execute("""
+            SELECT DISTINCT athlete_id, upload_type FROM uploads
+            WHERE athlete_id IN (SELECT value FROM json_each(?))
+        """, (wanted,)):
+            types.setdefault(aid, set()).add(t)
+    totals = {aid: _score_completion(profiles.get(aid, {}), counts.get(aid, 0), types.get(aid, ()))[0]
+              for aid in ids.unique()}
+    return ids.map(totals)
+
+
+def _score_completion(a: dict, mcount: int, types) -> Tuple[int, Dict[str, int]]:
     # profile fields
     fields = {
         "full_name": 10,
@@ -629,14 +1143,13 @@ def completion_score(athlete_id: str) -> Tuple[int, Dict[str, int]]:
     for k, w in fields.items():
         v = a.get(k)
         if k == "photo_path":
-            if v and Path(str(v)).exists():
+            if v and photo_exists(str(v)):
                 p += w
         else:
             if v is not None and str(v).strip() != "":
                 p += w
 
     # metrics
-    mcount = len(metrics)
     m = 0
     if mcount >= 12:
         m = 25
@@ -649,15 +1162,13 @@ def completion_score(athlete_id: str) -> Tuple[int, Dict[str, int]]:
 
     # uploads
     u = 0
-    if not uploads.empty:
-        types = uploads["upload_type"].astype(str).tolist()
-        if "medical_pdf" in types:
-            u += 6
-        if "photo" in types:
-            u += 5
-        if "video" in types:
-            u += 4
-        u = min(u, 15)
+    if "medical_pdf" in types:
+        u += 6
+    if "photo" in types:
+        u += 5
+    if "video" in types:
+        u += 4
+    u = min(u, 15)
 
     total = int(clamp(p + m + u, 0, 100))
     breakdown = {"Profile": int(p), "Metrics": int(m), "Uploads": int(u)}
@@ -667,8 +1178,18 @@ def completion_score(athlete_id: str) -> Tuple[int, Dict[str, int]]:
 # ============================================================
 # INIT
 # ============================================================
-init_db()
-ensure_demo_profiles_from_csv()
+@st.cache_resource(show_spinner=False)
+def _bootstrap() -> bool:
+    """Schema setup, demo seeding and dataset warm-up, once per server process rather than on every rerun."""
+    init_db()
+    ensure_demo_profiles_from_csv()
+    # parse every dataset up front so the first Benchmarks visit doesn't pay for it
+    for name in DATA_FILES:
+        load_csv(name)
+    return True
+
+
+_bootstrap()
 
 # ============================================================
 # HEADER + AUTH BAR
@@ -721,15 +1242,13 @@ with st.sidebar:
 
     st.divider()
     st.subheader("Data files status:")
-    for k, f in DATA_FILES.items():
-        exists = (BASE_DIR / f).exists()
-        st.write(f"✅ {f}" if exists else f"❌ {f}")
+    st.markdown("\n\n".join(f"✅ {f}" if exists else f"❌ {f}" for f, exists in data_file_status().items()))
 
 
 # ============================================================
 # PAGE: LOGIN / REGISTER
 # ============================================================
-if page == "Login / Register":
+def render_login(u):
     st.subheader("Login")
     with st.form("login_form"):
         email = st.text_input("Email", placeholder="you@email.com")
@@ -786,7 +1305,7 @@ if page == "Login / Register":
 # ============================================================
 # PAGE: HOME
 # ============================================================
-elif page == "Home":
+def render_home(u):
     st.markdown("### What does ASABIG cover?")
     st.markdown("""
 - Multi-sport talent identification (youth 7–23)
@@ -815,7 +1334,7 @@ elif page == "Home":
 # ============================================================
 # PAGE: BENCHMARKS & DATA
 # ============================================================
-elif page == "Benchmarks & Data":
+def render_benchmarks(u):
     st.subheader("Benchmarks & Data – ASABIG Pilot Demo")
 
     dataset_label = {
@@ -832,8 +1351,6 @@ elif page == "Benchmarks & Data":
         st.error(f"File not found: {DATA_FILES.get(key)}")
         st.stop()
 
-    df = safe_df(df)
-
     c1, c2, c3 = st.columns(3)
     with c1:
         st.metric("Rows", len(df))
@@ -843,47 +1360,38 @@ elif page == "Benchmarks & Data":
         st.write("Label")
         st.code(DATA_FILES.get(key, ""))
 
-    age_col = None
-    gender_col = None
-    for c in df.columns:
-        if c.lower() in ["age_group", "agegroup", "age group"]:
-            age_col = c
-        if c.lower() in ["gender", "sex"]:
-            gender_col = c
+    age_col, gender_col, age_opts, gender_opts = filter_options(key)
 
     f1, f2 = st.columns(2)
     with f1:
         if age_col:
-            age_val = st.selectbox("Age group filter", ["All"] + sorted(df[age_col].dropna().astype(str).unique().tolist()))
+            age_val = st.selectbox("Age group filter", ["All"] + age_opts)
         else:
             age_val = "All"
     with f2:
         if gender_col:
-            gender_val = st.selectbox("Gender filter", ["All"] + sorted(df[gender_col].dropna().astype(str).unique().tolist()))
+            gender_val = st.selectbox("Gender filter", ["All"] + gender_opts)
         else:
             gender_val = "All"
 
-    view = df.copy()
-    if age_col and age_val != "All":
-        view = view[view[age_col].astype(str) == str(age_val)]
-    if gender_col and gender_val != "All":
-        view = view[view[gender_col].astype(str) == str(gender_val)]
+    view = filtered_dataset(key, age_val, gender_val)
 
     st.write("Data preview")
-    st.dataframe(safe_df(view), use_container_width=True, height=420)
+    st.dataframe(view, use_container_width=True, height=420)
 
-    with st.expander("Summary (numeric columns)"):
-        nums = view.select_dtypes(include=["number"])
-        if nums.empty:
+    # computed only on demand (an expander body runs even when collapsed)
+    if st.checkbox("Show summary (numeric columns)"):
+        summary = dataset_summary(key, age_val, gender_val)
+        if summary is None:
             st.info("No numeric columns found in this view.")
         else:
-            st.dataframe(nums.describe().T, use_container_width=True)
+            st.dataframe(summary, use_container_width=True)
 
 
 # ============================================================
 # PAGE: ATHLETES LIST
 # ============================================================
-elif page == "Athletes (Demo List)":
+def render_athletes_list(u):
     st.subheader("Athletes (Demo + DB)")
     df = list_athletes_db()
     st.dataframe(df, use_container_width=True, height=520)
@@ -893,7 +1401,7 @@ elif page == "Athletes (Demo List)":
 # ============================================================
 # PAGE: ATHLETE PROFILE
 # ============================================================
-elif page == "Athlete Profile":
+def render_athlete_profile(u):
     st.subheader("Athlete Profile (DB)")
 
     athletes = list_athletes_db()
@@ -901,9 +1409,8 @@ elif page == "Athlete Profile":
         st.warning("No athletes found yet.")
         st.stop()
 
-    display_col = "full_name" if "full_name" in athletes.columns else athletes.columns[0]
-    name_to_id = dict(zip(athletes[display_col].astype(str), athletes["athlete_id"].astype(str)))
-    pick_name = st.selectbox("Select athlete:", athletes[display_col].astype(str).tolist())
+    names, name_to_id = athlete_names()
+    pick_name = st.selectbox("Select athlete:", names)
     athlete_id = name_to_id.get(pick_name)
 
     a = get_athlete(athlete_id)
@@ -956,8 +1463,9 @@ elif page == "Athlete Profile":
 
     with right:
         st.markdown("#### Photo")
-        if a.get("photo_path") and Path(str(a["photo_path"])).exists():
-            st.image(a["photo_path"], use_container_width=True)
+        img = photo_bytes(str(a["photo_path"])) if a.get("photo_path") else None
+        if img:
+            st.image(img, use_container_width=True)
         else:
             st.info("No photo uploaded yet.")
 
@@ -969,7 +1477,7 @@ elif page == "Athlete Profile":
 # ============================================================
 # PAGE: ATHLETE COMPARISON
 # ============================================================
-elif page == "Athlete Comparison":
+def render_athlete_comparison(u):
     st.subheader("Athlete Comparison – Side by Side (Pilot)")
 
     athletes = list_athletes_db()
@@ -978,12 +1486,26 @@ elif page == "Athlete Comparison":
         st.stop()
 
     MAX_COMPARE = 6
-    display_col = "full_name"
-    selected_names = st.multiselect(
-        f"Select up to {MAX_COMPARE} athletes:",
-        athletes[display_col].astype(str).tolist(),
-        default=athletes[display_col].astype(str).head(4).tolist() if len(athletes) >= 4 else None
-    )
+    name_filter = st.text_input("Filter names", key="compare_filter")
+    already = st.session_state.get("compare_selected", [])
+    all_names, name_to_id = athlete_names()
+    options = name_shortlist(all_names, name_filter)
+    kept = set(already)
+    options = already + [n for n in options if n not in kept]
+    offered = set(options)
+    default = [n for n in all_names[:4] if n in offered] if len(athletes) >= 4 else None
+    # the selection only takes effect on "Compare", so picking several names costs one rerun
+    with st.form("compare"):
+        selected_names = st.multiselect(
+            f"Select up to {MAX_COMPARE} athletes:",
+            options,
+            default=default,
+            key="compare_selected",
+        )
+        submitted = st.form_submit_button("Compare")
+    if submitted or "compare_last" not in st.session_state:
+        st.session_state["compare_last"] = selected_names
+    selected_names = st.session_state["compare_last"]
 
     if len(selected_names) > MAX_COMPARE:
         st.warning(f"Only first {MAX_COMPARE} athletes will be shown.")
@@ -993,27 +1515,25 @@ elif page == "Athlete Comparison":
         st.info("Select athletes to compare.")
         st.stop()
 
-    comp = athletes[athletes[display_col].astype(str).isin(selected_names)].copy()
-    comp["completion_score"] = comp["athlete_id"].apply(lambda x: completion_score(str(x))[0])
+    # matched on athlete_id, which stays valid even if the frame was refreshed after the labels
+    picked_ids = {name_to_id[n] for n in selected_names if n in name_to_id}
+    comp = athletes.loc[athletes["athlete_id"].astype(str).isin(picked_ids)]
+    comp = comp.assign(completion_score=completion_scores(comp["athlete_id"]))
     st.dataframe(comp, use_container_width=True, height=250)
 
     st.markdown("### Compare one metric trend (DB metrics)")
     ids = comp["athlete_id"].astype(str).tolist()
-    # collect metric names across selected athletes
-    metric_names = []
-    for aid in ids:
-        latest = metrics_pivot_latest(aid)
-        metric_names += latest["metric_name"].astype(str).tolist() if not latest.empty else []
-    metric_names = sorted(list(set(metric_names)))
+    metric_names = metric_names_for(tuple(ids))
 
     if not metric_names:
         st.info("No DB metrics yet for these athletes (add some in Profile & Data Entry).")
     else:
         metric_pick = st.selectbox("Metric to compare (trend)", metric_names)
+        # picker labels, so athletes sharing a name get separate chart lines
+        id_to_name = {aid: label for label, aid in name_to_id.items()}
         chart_df = pd.DataFrame()
         for aid in ids:
-            a = get_athlete(aid) or {}
-            name = a.get("full_name", aid)
+            name = id_to_name.get(aid, aid)
             t = metric_trend(aid, metric_pick)
             if t.empty:
                 continue
@@ -1031,7 +1551,57 @@ elif page == "Athlete Comparison":
 # ============================================================
 # PAGE: DASHBOARD (ADVANCED)
 # ============================================================
-elif page == "Dashboard":
+@st.fragment
+def scout_athlete_panel(user_id: int, view: pd.DataFrame):
+    """Shortlist + notes for the Scout candidate list; reruns on its own, not the whole dashboard."""
+    st.markdown("### Shortlist")
+    # filled at the end so it already reflects a save/remove made further down in this run
+    sl_slot = st.empty()
+
+    st.markdown("#### Add/Update shortlist entry")
+    if not view.empty:
+        names, name_to_id = athlete_name_index(view)
+        pick = st.selectbox("Choose athlete to shortlist", names)
+        athlete_id = name_to_id[pick]
+
+        c1, c2, c3 = st.columns([2, 1, 1])
+        with c1:
+            tag = st.text_input("Tag", placeholder="e.g., Fast, High potential, Needs review")
+        with c2:
+            priority = st.selectbox("Priority", [1, 2, 3, 4, 5], index=2)
+        with c3:
+            st.write(" ")
+            st.write(" ")
+            if st.button("Save to shortlist"):
+                scout_toggle_shortlist(user_id, athlete_id, tag=tag.strip(), priority=int(priority))
+                st.success("Saved.")
+
+        if st.button("Remove from shortlist"):
+            scout_remove_shortlist(user_id, athlete_id)
+            st.success("Removed.")
+
+        st.divider()
+        st.markdown("### Scout Notes (selected athlete)")
+        with st.form("scout_note_form"):
+            rating = st.slider("Rating (1-10)", 1, 10, 7)
+            note = st.text_area("Note (strengths, weaknesses, potential, recommendation)")
+            submit = st.form_submit_button("Save note")
+        if submit:
+            if note.strip():
+                add_scout_note(user_id, athlete_id, note.strip(), int(rating))
+                st.success("Saved.")
+            else:
+                st.error("Note is required.")
+
+        st.dataframe(list_scout_notes(athlete_id), use_container_width=True, height=220)
+
+        st.markdown("### Quick metrics snapshot")
+        st.dataframe(metrics_pivot_latest(athlete_id), use_container_width=True, height=220)
+
+    sl_slot.dataframe(scout_shortlist_df(user_id), use_container_width=True, height=240)
+
+
+def render_dashboard(u):
     if not u:
         st.warning("Please login first.")
         st.stop()
@@ -1100,7 +1670,7 @@ elif page == "Dashboard":
         st.divider()
         st.markdown("### Uploads")
         udf = list_uploads(linked_athlete_id)
-        st.dataframe(udf, use_container_width=True, height=260)
+        show_df(udf, "player_uploads", height=260)
 
     # ---------------------------
     # SCOUT DASHBOARD
@@ -1110,29 +1680,38 @@ elif page == "Dashboard":
 
         athletes = list_athletes_db()
 
-        filters = st.columns(4)
-        with filters[0]:
-            sport_f = st.selectbox("Sport", ["All"] + sorted(athletes["sport"].dropna().unique().tolist()))
-        with filters[1]:
-            age_f = st.selectbox("Age Group", ["All"] + sorted(athletes["age_group"].dropna().unique().tolist()))
-        with filters[2]:
-            city_f = st.selectbox("City", ["All"] + sorted(athletes["city"].dropna().unique().tolist()))
-        with filters[3]:
-            min_score = st.slider("Min Completion Score", 0, 100, 40)
-
-        q = st.text_input("Search by name")
-        view = athletes.copy()
-
-        if sport_f != "All":
-            view = view[view["sport"].astype(str) == str(sport_f)]
-        if age_f != "All":
-            view = view[view["age_group"].astype(str) == str(age_f)]
-        if city_f != "All":
-            view = view[view["city"].astype(str) == str(city_f)]
-        if q.strip():
-            view = view[view["full_name"].str.lower().str.contains(q.strip().lower(), na=False)]
-
-        view["completion_score"] = view["athlete_id"].apply(lambda x: completion_score(str(x))[0])
+        # filters are applied on submit only (each change would otherwise rescore every athlete)
+        opts = athlete_filter_options()
+        with st.form("scout_search"):
+            filters = st.columns(4)
+            with filters[0]:
+                sport_f = st.selectbox("Sport", ["All"] + opts["sport"])
+            with filters[1]:
+                age_f = st.selectbox("Age Group", ["All"] + opts["age_group"])
+            with filters[2]:
+                city_f = st.selectbox("City", ["All"] + opts["city"])
+            with filters[3]:
+                min_score = st.slider("Min Completion Score", 0, 100, 40)
+
+            q = st.text_input("Search by name, city or sport")
+            st.form_submit_button("Search")
+        ql = q.strip().lower()
+        if ql:
+            # filters go into the search query, so the row cap applies after them
+            view = search_athletes(ql, *(None if v == "All" else v for v in (sport_f, age_f, city_f)))
+            if len(view) >= SEARCH_LIMIT:
+                st.warning(f"Showing the first {SEARCH_LIMIT} matches only — refine the search to narrow it down.")
+        else:
+            view = athletes
+            # one boolean mask over the string columns, sliced once (no astype(str) copies per filter)
+            mask = np.ones(len(view), dtype=bool)
+            for col, val in (("sport", sport_f), ("age_group", age_f), ("city", city_f)):
+                if val != "All":
+                    mask &= view[col].eq(val).to_numpy(dtype=bool, na_value=False)
+            if not mask.all():
+                view = view[mask]
+
+        view = view.assign(completion_score=completion_scores(view["athlete_id"]))
         view = view[view["completion_score"] >= min_score].sort_values(["completion_score", "full_name"], ascending=[False, True])
 
         st.markdown("#### Candidate list")
@@ -1140,51 +1719,7 @@ elif page == "Dashboard":
 
         st.divider()
 
-        st.markdown("### Shortlist")
-        sl = scout_shortlist_df(user_id)
-        st.dataframe(sl, use_container_width=True, height=240)
-
-        st.markdown("#### Add/Update shortlist entry")
-        if not view.empty:
-            pick = st.selectbox("Choose athlete to shortlist", view["full_name"].astype(str).tolist())
-            athlete_id = view[view["full_name"].astype(str) == pick]["athlete_id"].astype(str).iloc[0]
-
-            c1, c2, c3 = st.columns([2, 1, 1])
-            with c1:
-                tag = st.text_input("Tag", placeholder="e.g., Fast, High potential, Needs review")
-            with c2:
-                priority = st.selectbox("Priority", [1, 2, 3, 4, 5], index=2)
-            with c3:
-                st.write(" ")
-                st.write(" ")
-                if st.button("Save to shortlist"):
-                    scout_toggle_shortlist(user_id, athlete_id, tag=tag.strip(), priority=int(priority))
-                    st.success("Saved.")
-                    st.rerun()
-
-            if st.button("Remove from shortlist"):
-                scout_remove_shortlist(user_id, athlete_id)
-                st.success("Removed.")
-                st.rerun()
-
-            st.divider()
-            st.markdown("### Scout Notes (selected athlete)")
-            with st.form("scout_note_form"):
-                rating = st.slider("Rating (1-10)", 1, 10, 7)
-                note = st.text_area("Note (strengths, weaknesses, potential, recommendation)")
-                submit = st.form_submit_button("Save note")
-            if submit:
-                if note.strip():
-                    add_scout_note(user_id, athlete_id, note.strip(), int(rating))
-                    st.success("Saved.")
-                    st.rerun()
-                else:
-                    st.error("Note is required.")
-
-            st.dataframe(list_scout_notes(athlete_id), use_container_width=True, height=220)
-
-            st.markdown("### Quick metrics snapshot")
-            st.dataframe(metrics_pivot_latest(athlete_id), use_container_width=True, height=220)
+        scout_athlete_panel(user_id, view)
 
     # ---------------------------
     # ACADEMY DASHBOARD
@@ -1193,19 +1728,26 @@ elif page == "Dashboard":
         st.markdown(f"### Academy: {academy_name or '(not set)'}")
         st.caption("Roster management + analytics (pilot).")
 
-        athletes = list_athletes_db()
-        pick = st.selectbox("Add athlete to roster:", athletes["full_name"].astype(str).tolist())
-        athlete_id = athletes[athletes["full_name"].astype(str) == pick]["athlete_id"].astype(str).iloc[0]
+        names, name_to_id = athlete_names()
+        pick = st.selectbox("Add athlete to roster:", names)
+        athlete_id = name_to_id[pick]
 
         if st.button("Add to roster"):
             academy_add_roster(user_id, athlete_id)
             st.success("Added (or already exists).")
-            st.rerun()
+
+        with st.form("roster_bulk"):
+            bulk_ids = st.text_area("Bulk add athlete IDs (one per line)", height=100)
+            if st.form_submit_button("Add all"):
+                ids = list(dict.fromkeys(x.strip() for x in bulk_ids.splitlines() if x.strip()))
+                if ids:
+                    added = academy_add_roster_bulk(user_id, ids)
+                    st.success(f"Added {added} of {len(ids)} (unknown or already rostered IDs skipped).")
 
         st.divider()
         roster = academy_roster(user_id)
         st.markdown("### Roster")
-        st.dataframe(roster, use_container_width=True, height=320)
+        show_df(roster, "academy_roster")
 
         st.divider()
         st.markdown("### Academy Analytics")
@@ -1236,44 +1778,35 @@ elif page == "Dashboard":
             st.bar_chart(city_counts)
 
             st.markdown("#### Data quality (Completion Scores)")
-            roster_scores = roster.copy()
-            roster_scores["completion_score"] = roster_scores["athlete_id"].astype(str).apply(lambda x: completion_score(str(x))[0])
-            st.dataframe(roster_scores.sort_values("completion_score", ascending=False), use_container_width=True, height=260)
+            roster_scores = roster.assign(completion_score=completion_scores(roster["athlete_id"]))
+            show_df(roster_scores.sort_values("completion_score", ascending=False), "academy_roster_scores", height=260)
 
     # ---------------------------
     # ADMIN DASHBOARD
     # ---------------------------
     elif role == "Admin":
         st.markdown("### Admin Overview")
-        conn = db()
-        users_df = pd.read_sql_query(
-            "SELECT id, full_name, email, role, linked_athlete_id, academy_name, created_at FROM users ORDER BY created_at DESC",
-            conn
-        )
-        conn.close()
 
         athletes = list_athletes_db()
         c1, c2, c3 = st.columns(3)
         with c1:
-            st.metric("Users", len(users_df))
+            st.metric("Users", count_users())
         with c2:
             st.metric("Athletes", len(athletes))
         with c3:
-            st.metric("Data files present", sum([(BASE_DIR / f).exists() for f in DATA_FILES.values()]))
+            st.metric("Data files present", sum(data_file_status().values()))
 
-        st.markdown("#### Users")
-        st.dataframe(safe_df(users_df), use_container_width=True, height=260)
+        admin_users_panel()
 
         st.markdown("#### Athletes (with completion)")
-        adf = athletes.copy()
-        adf["completion_score"] = adf["athlete_id"].astype(str).apply(lambda x: completion_score(str(x))[0])
-        st.dataframe(adf.sort_values("completion_score", ascending=False), use_container_width=True, height=320)
+        adf = athletes.assign(completion_score=completion_scores(athletes["athlete_id"]))
+        show_df(adf.sort_values("completion_score", ascending=False), "admin_dash_athletes")
 
 
 # ============================================================
 # PAGE: PROFILE & DATA ENTRY (PERMISSIONS REFINED)
 # ============================================================
-elif page == "Profile & Data Entry":
+def render_data_entry(u):
     if not u:
         st.warning("Please login first.")
         st.stop()
@@ -1291,7 +1824,6 @@ elif page == "Profile & Data Entry":
     can_edit_profile = role in ["Player", "Parent", "Admin", "Academy"]
     can_add_metrics = role in ["Player", "Parent", "Scout", "Academy", "Admin"]
 
-    athletes = list_athletes_db()
     selected_athlete_id = None
 
     if role in ["Player", "Parent"]:
@@ -1301,8 +1833,9 @@ elif page == "Profile & Data Entry":
         else:
             st.warning("No linked athlete yet — create one below and it will auto-link to your account.")
     else:
-        pick = st.selectbox("Select athlete:", athletes["full_name"].astype(str).tolist())
-        selected_athlete_id = athletes[athletes["full_name"].astype(str) == pick]["athlete_id"].astype(str).iloc[0]
+        names, name_to_id = athlete_names()
+        pick = st.selectbox("Select athlete:", names)
+        selected_athlete_id = name_to_id[pick]
 
     st.divider()
 
@@ -1313,9 +1846,8 @@ elif page == "Profile & Data Entry":
     if selected_athlete_id:
         current = get_athlete(selected_athlete_id)
 
-        score, br = completion_score(selected_athlete_id) if current else (0, {"Profile": 0, "Metrics": 0, "Uploads": 0})
-        st.metric("Completion Score", f"{score}/100")
-        st.progress(score / 100 if score else 0)
+        # filled at the end of the page so it already counts a metric added further down
+        score_slot = st.empty()
 
         # SCOUT cannot edit profile
         if role == "Scout":
@@ -1354,16 +1886,13 @@ elif page == "Profile & Data Entry":
                         "photo_path": current.get("photo_path") if current else None,
                         "preferences_json": prefs.strip() or None,
                     }
-                    upsert_athlete_profile(selected_athlete_id, data, created_by_user_id=user_id)
-                    st.success("Saved athlete profile.")
-
                     # Auto-link for Player/Parent if missing
-                    if role in ["Player", "Parent"] and not linked_athlete_id:
-                        conn = db()
-                        cur = conn.cursor()
-                        cur.execute("UPDATE users SET linked_athlete_id=? WHERE id=?", (selected_athlete_id, user_id))
-                        conn.commit()
-                        conn.close()
+                    auto_link = role in ["Player", "Parent"] and not linked_athlete_id
+                    upsert_athlete_profile(selected_athlete_id, data, created_by_user_id=user_id,
+                                           link_to_user_id=user_id if auto_link else None)
+                    st.success("Saved athlete profile.")
+                    if auto_link:
+                        st.session_state.pop("_user_row", None)
                         st.success("Linked athlete to your account.")
                     st.rerun()
 
@@ -1392,16 +1921,20 @@ elif page == "Profile & Data Entry":
                         notes=notes.strip() or None
                     )
                     st.success("Metric added.")
-                    st.rerun()
 
         st.markdown("### Recent metrics")
-        st.dataframe(list_metrics(selected_athlete_id), use_container_width=True, height=320)
+        show_df(list_metrics(selected_athlete_id), "entry_metrics")
+
+        score, _ = completion_score(selected_athlete_id) if current else (0, {})
+        with score_slot.container():
+            st.metric("Completion Score", f"{score}/100")
+            st.progress(score / 100 if score else 0)
 
 
 # ============================================================
 # PAGE: UPLOADS (PERMISSIONS)
 # ============================================================
-elif page == "Uploads (PDF/Photo/Video)":
+def render_uploads(u):
     if not u:
         st.warning("Please login first.")
         st.stop()
@@ -1414,7 +1947,6 @@ elif page == "Uploads (PDF/Photo/Video)":
     can_upload_file = role in ["Player", "Parent", "Academy", "Admin"]
     can_upload_video_link = role in ["Player", "Parent", "Scout", "Academy", "Admin"]
 
-    athletes = list_athletes_db()
     selected_athlete_id = None
 
     if role in ["Player", "Parent"]:
@@ -1424,8 +1956,9 @@ elif page == "Uploads (PDF/Photo/Video)":
             st.stop()
         st.info(f"Uploading for athlete: {selected_athlete_id}")
     else:
-        pick = st.selectbox("Select athlete:", athletes["full_name"].astype(str).tolist())
-        selected_athlete_id = athletes[athletes["full_name"].astype(str) == pick]["athlete_id"].astype(str).iloc[0]
+        names, name_to_id = athlete_names()
+        pick = st.selectbox("Select athlete:", names)
+        selected_athlete_id = name_to_id[pick]
 
     st.divider()
     tab1, tab2, tab3 = st.tabs(["Medical PDF", "Photo", "Video"])
@@ -1445,13 +1978,12 @@ elif page == "Uploads (PDF/Photo/Video)":
                         athlete_id=selected_athlete_id,
                         upload_type="medical_pdf",
                         title=(title.strip() or "Medical PDF"),
-                        file_bytes=pdf.getvalue(),
+                        file_obj=pdf,
                         filename=pdf.name,
                         link_url=None,
                         uploaded_by_user_id=user_id
                     )
                     st.success("Saved medical PDF.")
-                    st.rerun()
 
     with tab2:
         st.markdown("#### Photo")
@@ -1467,16 +1999,13 @@ elif page == "Uploads (PDF/Photo/Video)":
                         athlete_id=selected_athlete_id,
                         upload_type="photo",
                         title="Profile Photo",
-                        file_bytes=img.getvalue(),
+                        file_obj=img,
                         filename=img.name,
                         link_url=None,
                         uploaded_by_user_id=user_id
                     )
-                    a = get_athlete(selected_athlete_id) or {}
-                    a["photo_path"] = file_path
-                    upsert_athlete_profile(selected_athlete_id, a, created_by_user_id=None)
+                    set_athlete_photo(selected_athlete_id, file_path)
                     st.success("Saved photo and updated athlete profile.")
-                    st.rerun()
 
     with tab3:
         st.markdown("#### Video (link or file)")
@@ -1493,30 +2022,46 @@ elif page == "Uploads (PDF/Photo/Video)":
                 elif vlink and not can_upload_video_link:
                     st.error("Your role can’t add video links.")
                 else:
-                    file_bytes = vfile.getvalue() if vfile else None
-                    filename = vfile.name if vfile else None
                     save_upload(
                         athlete_id=selected_athlete_id,
                         upload_type="video",
                         title=(vtitle.strip() or "Video"),
-                        file_bytes=file_bytes,
-                        filename=filename,
+                        file_obj=vfile,
+                        filename=(vfile.name if vfile else None),
                         link_url=(vlink.strip() or None),
                         uploaded_by_user_id=user_id
                     )
                     st.success("Saved video.")
-                    st.rerun()
 
     st.divider()
     st.markdown("### All uploads for athlete")
     udf = list_uploads(selected_athlete_id)
-    st.dataframe(udf, use_container_width=True, height=420)
+    show_df(udf, "uploads_all", height=420)
 
 
 # ============================================================
 # PAGE: ADMIN PANEL
 # ============================================================
-elif page == "Admin Panel":
+@st.fragment
+def admin_users_panel():
+    """Paged users table (Admin dashboard + Admin Panel); paging reruns only this block."""
+    # stack of page cursors so "Newer" can step back without re-scanning
+    cursors = st.session_state.setdefault("users_cursor", [USERS_CURSOR_START])
+    users_df = list_users_db(cursors[-1])
+
+    st.markdown("### Users")
+    st.caption(f"Page {len(cursors)} · {count_users()} users total")
+    show_df(users_df, "admin_users", height=360)
+    # callbacks move the cursor before the fragment reruns, so no extra st.rerun() pass
+    last_id = int(users_df["id"].iloc[-1]) if len(users_df) else USERS_CURSOR_START
+    b1, b2 = st.columns(2)
+    with b1:
+        st.button("Newer", disabled=len(cursors) == 1, on_click=cursors.pop)
+    with b2:
+        st.button("Load more", disabled=len(users_df) < USERS_PAGE_SIZE, on_click=cursors.append, args=(last_id,))
+
+
+def render_admin_panel(u):
     if not u or u[4] != "Admin":
         st.warning("Admin only.")
         st.stop()
@@ -1524,32 +2069,20 @@ elif page == "Admin Panel":
     st.subheader("Admin Panel (Pilot)")
     st.caption("User management + exports (pilot).")
 
-    conn = db()
-    users_df = pd.read_sql_query("SELECT id, full_name, email, role, linked_athlete_id, academy_name, created_at FROM users ORDER BY created_at DESC", conn)
-    conn.close()
-
-    st.markdown("### Users")
-    st.dataframe(safe_df(users_df), use_container_width=True, height=360)
+    admin_users_panel()
 
     st.markdown("### Export athletes/metrics/uploads")
-    a = list_athletes_db()
-    st.download_button("Download athletes.csv (export)", data=a.to_csv(index=False).encode("utf-8"), file_name="asabig_athletes_export.csv")
-
-    conn = db()
-    metrics_df = pd.read_sql_query("SELECT athlete_id, metric_name, metric_value, unit, measured_at, source_role, notes FROM athlete_metrics ORDER BY measured_at DESC", conn)
-    uploads_df = pd.read_sql_query("SELECT athlete_id, upload_type, title, file_path, link_url, created_at FROM uploads ORDER BY created_at DESC", conn)
-    shortlist_df = pd.read_sql_query("SELECT scout_user_id, athlete_id, tag, priority, created_at FROM scout_shortlist ORDER BY created_at DESC", conn)
-    conn.close()
-
-    st.download_button("Download metrics.csv (export)", data=safe_df(metrics_df).to_csv(index=False).encode("utf-8"), file_name="asabig_metrics_export.csv")
-    st.download_button("Download uploads.csv (export)", data=safe_df(uploads_df).to_csv(index=False).encode("utf-8"), file_name="asabig_uploads_export.csv")
-    st.download_button("Download scout_shortlist.csv (export)", data=safe_df(shortlist_df).to_csv(index=False).encode("utf-8"), file_name="asabig_scout_shortlist_export.csv")
+    # exports are generated only when their button is clicked
+    st.download_button("Download athletes.csv (export)", data=athletes_csv_bytes, file_name="asabig_athletes_export.csv")
+    st.download_button("Download metrics.csv (export)", data=functools.partial(export_csv_bytes, "metrics"), file_name="asabig_metrics_export.csv")
+    st.download_button("Download uploads.csv (export)", data=functools.partial(export_csv_bytes, "uploads"), file_name="asabig_uploads_export.csv")
+    st.download_button("Download scout_shortlist.csv (export)", data=functools.partial(export_csv_bytes, "scout_shortlist"), file_name="asabig_scout_shortlist_export.csv")
 
 
 # ============================================================
 # PAGE: ABOUT / GOVERNANCE
 # ============================================================
-elif page == "About / Governance":
+def render_about(u):
     st.subheader("About / Governance (Pilot)")
     st.markdown("""
 **ASABIG** is a national talent identification concept to unify youth athlete data and scouting signals.
@@ -1578,5 +2111,26 @@ elif page == "About / Governance":
 # ============================================================
 # FALLBACK
 # ============================================================
-else:
+def render_fallback(u):
     st.info("Select a page from the sidebar.")
+
+
+# ============================================================
+# DISPATCH
+# ============================================================
+# only the selected page's function runs, so each page loads just the data it uses
+PAGES = {
+    "Login / Register": render_login,
+    "Home": render_home,
+    "Benchmarks & Data": render_benchmarks,
+    "Athletes (Demo List)": render_athletes_list,
+    "Athlete Profile": render_athlete_profile,
+    "Athlete Comparison": render_athlete_comparison,
+    "Dashboard": render_dashboard,
+    "Profile & Data Entry": render_data_entry,
+    "Uploads (PDF/Photo/Video)": render_uploads,
+    "Admin Panel": render_admin_panel,
+    "About / Governance": render_about,
+}
+
+PAGES.get(page, render_fallback)(u)
@@ -25,20 +25,34 @@ def inject():
     if not DB_PATH.exists():
         raise FileNotFoundError("asabig.db not found")
 
-    conn = sqlite3.connect(DB_PATH)
-
-    for table, file in DATA_FILES.items():
-        file_path = BASE_DIR / file
-        if not file_path.exists():
-            print(f"⚠️ Missing file: {file}")
-            continue
-
-        df = pd.read_csv(file_path)
-        df["injected_at"] = datetime.utcnow().isoformat()
-        df.to_sql(table, conn, if_exists="replace", index=False)
-        print(f"✅ Injected: {table} ({len(df)} rows)")
-
-    conn.close()
+    # autocommit mode + explicit BEGIN/COMMIT: all tables load in one transaction
+    conn = sqlite3.connect(DB_PATH, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    injected_at = datetime.utcnow().isoformat()
+
+    conn.execute("BEGIN")
+    try:
+        for table, file in DATA_FILES.items():
+            file_path = BASE_DIR / file
+            if not file_path.exists():
+                print(f"⚠️ Missing file: {file}")
+                continue
+
+            df = pd.read_csv(file_path)
+            df["injected_at"] = injected_at
+            conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+            conn.execute(pd.io.sql.get_schema(df, table))
+            placeholders = ",".join("?" * len(df.columns))
+            conn.executemany(f'INSERT INTO "{table}" VALUES ({placeholders})',
+                             df.itertuples(index=False, name=None))
+            print(f"✅ Injected: {table} ({len(df)} rows)")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
     print("🎯 Demo data injection completed")
 
 if __name__ == "__main__":